@@ -7,9 +7,10 @@ __all__ = [
     "register_type_inference",
 ]
 
+import collections
 import dataclasses
 import functools
-import operator
+import inspect
 import types
 import typing
 from datetime import datetime
@@ -23,22 +24,41 @@ import click.core
 Param = typing.ParamSpec("Param")
 RetType = typing.TypeVar("RetType")
 Arg = typing.TypeVar("Arg")
-_T = typing.TypeVar("_T")
 
 InferenceType = dict[typing.Type[Any], click.ParamType]
 
-_TYPE_INFERENCE: InferenceType = {
-    int: click.INT,
-    str: click.STRING,
-    float: click.FLOAT,
-    bool: click.BOOL,
-    UUID: click.UUID,
-    datetime: click.DateTime(),
-    Path: click.Path(path_type=Path),
-}
+_Stub = click.core.Option | click.core.Argument
 
+_AnnotationTemplate = tuple[str, Callable[..., Any], tuple[Any, ...], tuple[tuple[str, Any], ...]]
 
-@dataclasses.dataclass
+_TYPE_INFERENCE: typing.Mapping[typing.Type[Any], click.ParamType] = types.MappingProxyType(
+    {
+        int: click.INT,
+        str: click.STRING,
+        float: click.FLOAT,
+        bool: click.BOOL,
+        UUID: click.UUID,
+        datetime: click.DateTime(),
+        Path: click.Path(path_type=Path),
+    })
+"""Globally registered type inferences
+
+This is read-only.  ``register_type_inference()`` replaces it with a new mapping rather than mutating it, so it may be
+used directly without taking a defensive copy."""
+
+_PARAM_TYPE_INTERN: dict[tuple[Any, ...], click.ParamType] = {}
+"""Registered ParamType objects keyed by their type and attributes so that equivalent objects can be shared"""
+
+_DECORATOR_CACHE_SIZE = 128
+
+_DECORATOR_CACHE: collections.OrderedDict[tuple[Any, ...], tuple[Any, ...]] = collections.OrderedDict()
+"""Decorators previously built by ``dataclass_click()`` keyed by its arguments
+
+Entries hold strong references to arg_class, factory and type_inferences, so these live until evicted.  The cache is
+least-recently-used, holding at most ``_DECORATOR_CACHE_SIZE`` entries."""
+
+
+@dataclasses.dataclass(slots=True)
 class _DelayedCall(typing.Generic[Param, RetType]):
     """Delayed call to a click decorator
 
@@ -47,9 +67,13 @@ class _DelayedCall(typing.Generic[Param, RetType]):
     callable: Callable[Param, RetType]
     args: tuple[Any, ...]
     kwargs: dict[str, Any]
+    is_option: bool = dataclasses.field(init=False, repr=False, compare=False)
+
+    def __post_init__(self) -> None:
+        self.is_option = self.callable is click.option
 
 
-@dataclasses.dataclass
+@dataclasses.dataclass(slots=True)
 class _DelayedFunction(typing.Generic[Param, RetType]):
     callable: Callable[Param, RetType]
 
@@ -113,29 +137,30 @@ def dataclass_click(arg_class, *, kw_name=None, type_inferences=None, factory=No
         ...
     ```
 
+    Decorators are cached, so using the same arg_class with the same arguments for several commands only analyzes the
+    class once.  As a consequence, changes made to a ``type_inferences`` dict after it has been passed here are not
+    respected.  The cache keeps the most recently used decorators, and with them references to their arg_class, factory
+    and type_inferences.
+
     :param arg_class: The class object to pass
     :param kw_name: If set, pass the dataclass object by to this kwarg name instead of the first positional argument
     :param type_inferences: Type inference overrides.  It is preferred register type inferences globally if possible.
     :param factory: A factory function to use instead of the constructor"""
+    # type_inferences and _TYPE_INFERENCE are keyed by id() but also held in the cached value so ids can't be reused
+    cache_key = (arg_class, kw_name, id(type_inferences) if type_inferences else None, id(_TYPE_INFERENCE), factory)
+    try:
+        cached = _DECORATOR_CACHE.get(cache_key)
+        cacheable = True
+    except TypeError:
+        # Unhashable factory
+        cached = None
+        cacheable = False
+    if cached is not None:
+        _DECORATOR_CACHE.move_to_end(cache_key)
+        return cached[2]
 
     def decorator(func) -> Callable[..., RetType]:
-
-        @functools.wraps(func)
-        def wrapper(*args, **kwargs):
-            arg_class_args = {}
-            for key in annotations:
-                # DONT_PASS is also used by calling code to indicate defaults that should not be passed
-                value = kwargs.pop(key, DONT_PASS)
-                if value is not DONT_PASS:
-                    arg_class_args[key] = value
-
-            arg_class_object = factory_(**arg_class_args)  # type: ignore
-            if kw_name is not None:
-                kwargs[kw_name] = arg_class_object
-            else:
-                args = (arg_class_object, *args)
-            return func(*args, **kwargs)
-
+        wrapper = _make_wrapper(func, tuple(annotations), factory_, kw_name)
         for annotation in reversed(annotations.values()):
             delayed_decorator = annotation.callable(*annotation.args, **annotation.kwargs)
             wrapper = delayed_decorator(wrapper)
@@ -144,104 +169,141 @@ def dataclass_click(arg_class, *, kw_name=None, type_inferences=None, factory=No
 
     factory_ = factory if factory is not None else arg_class
     annotations = _collect_click_annotations(arg_class)
-    _patch_names(annotations)
-    _patch_click_types(arg_class, annotations, type_inferences)
-    _patch_required(arg_class, annotations)
+    _patch_annotations(arg_class, annotations, type_inferences)
+    if cacheable:
+        if len(_DECORATOR_CACHE) >= _DECORATOR_CACHE_SIZE:
+            _DECORATOR_CACHE.popitem(last=False)
+        _DECORATOR_CACHE[cache_key] = (type_inferences, _TYPE_INFERENCE, decorator)
     return decorator
 
 
-def _patch_names(annotations: dict[str, _DelayedCall]) -> None:
-    """Set names for all options and arguments
+def _make_wrapper(
+        func: Callable[..., RetType], keys: tuple[str, ...], factory: Callable[..., Any],
+        kw_name: str | None) -> Callable[..., RetType]:
+    """Generate the function click will call, collecting annotated kwargs into an object of arg_class
+
+    :param func: The decorated function
+    :param keys: Attribute names to pop from kwargs and pass to the factory
+    :param factory: Callable to construct the arg_class object
+    :param kw_name: If set, pass the constructed object as this kwarg instead of the first positional argument
+    :return: The wrapper, with func's metadata copied onto it"""
+    wrapper = _wrapper_factory(keys, kw_name)(DONT_PASS, factory, func)
+    return functools.wraps(func)(wrapper)
+
+
+@functools.lru_cache(maxsize=1024)
+def _wrapper_factory(keys: tuple[str, ...], kw_name: str | None) -> Callable[..., Callable[..., Any]]:
+    """Compile a function which builds wrappers for the given keys and kw_name
+
+    The set of keys is fixed, so, much like ``dataclasses`` does for ``__init__``, the wrapper's source is generated with
+    one unrolled ``kwargs.pop()`` per key.  This avoids looping over the keys on every invocation.  The source depends
+    only on keys and kw_name so it is compiled once per shape and reused for every decorated function sharing it.
+    :param keys: Attribute names to pop from kwargs and pass to the factory
+    :param kw_name: If set, pass the constructed object as this kwarg instead of the first positional argument
+    :return: A function taking (dont_pass, factory, func) and returning the wrapper"""
+    # Like dataclasses._create_fn, wrapper is defined inside an outer function so that dont_pass, factory and func are
+    # closure cells rather than globals looked up on every call.
+    lines = [
+        "def __create_fn__(dont_pass, factory, func):",
+        "    def wrapper(*args, **kwargs):",
+        "        arg_class_args = {}",
+    ]
+    for key in keys:
+        # DONT_PASS is also used by calling code to indicate defaults that should not be passed
+        lines.append(f"        value = kwargs.pop({key!r}, dont_pass)")
+        lines.append("        if value is not dont_pass:")
+        lines.append(f"            arg_class_args[{key!r}] = value")
+    lines.append("        arg_class_object = factory(**arg_class_args)")
+    if kw_name is not None:
+        lines.append(f"        kwargs[{kw_name!r}] = arg_class_object")
+    else:
+        lines.append("        args = (arg_class_object, *args)")
+    lines.append("        return func(*args, **kwargs)")
+    lines.append("    return wrapper")
+    namespace: dict[str, Any] = {}
+    exec("\n".join(lines), namespace)
+    return namespace["__create_fn__"]
+
+
+def _patch_annotations(arg_class: type, annotations: dict[str, _DelayedCall], inferences: InferenceType | None) -> None:
+    """Complete the collected annotations ready to be passed to click
 
-    Two things may be added:
+    This is done in a single pass over the annotations.  For each one:
      - The attribute name will always be added, allowing the user input to be mapped back onto the dataclass
      - For options, an option name may be added if there are none.  Eg: some_option will add --some-option
+     - If ``type`` was not set, it is inferred from the dataclass type hint
+     - If the type hint on the dataclass was not Optional and neither ``default`` nor ``required`` were set on an
+       option, then it is marked ``required=True``
 
+    :param arg_class: The dataclass being analyzed
     :param annotations: Annotations to mutate
-    :return: None annotations are mutated in place"""
-    for key, annotation in annotations.items():
-        if annotation.callable is click.option and not any(name.startswith("") for name in annotation.args):
-            annotation.args = (_option_name(key), *annotation.args)
-        annotation.args = (key, *annotation.args)
-
-
-def _patch_click_types(
-        arg_class: typing.Type[Arg], annotations: dict[str, _DelayedCall], inferences: InferenceType | None) -> None:
-    """Default option and argument types based on their dataclass type hint
-
-    :param arg_class: The dataclass to collect
-    :param annotations: The annotations that have already been collected
     :param inferences: Optional dict of type hint inferences that override the defaults.
-    :return: None, annotations are changed in place
-    """
-    if inferences is not None:
-        complete_type_inferences = _TYPE_INFERENCE.copy()
-        complete_type_inferences.update(inferences)
+    :return: None, annotations are mutated in place"""
+    complete_type_inferences: typing.Mapping[typing.Type[Any], click.ParamType]
+    if inferences:
+        # Layer the overrides over the defaults rather than copying every registered inference
+        complete_type_inferences = collections.ChainMap(inferences, _TYPE_INFERENCE)  # type: ignore[arg-type]
     else:
         complete_type_inferences = _TYPE_INFERENCE
 
-    type_hints = typing.get_type_hints(arg_class)
+    type_hints = _cached_type_hints(arg_class)
     for key, annotation in annotations.items():
-        hint: typing.Type[Any]
-        _, hint = _strip_optional(type_hints[key])
-        if "type" not in annotation.kwargs:
-            stub: click.core.Option | click.core.Argument
-            if annotation.callable is click.option:
-                stub = click.core.Option(annotation.args, **annotation.kwargs)
-                if stub.is_flag:
-                    continue
-            else:
-                stub = click.core.Argument(annotation.args, **annotation.kwargs)
+        is_option = annotation.is_option
+        # Click treats any declaration starting with a non-alphanumeric character, such as "-f" or "+w/-w", as an option
+        # name.  If there is one, a name was already supplied.
+        if is_option and not any(isinstance(name, str) and name[:1] != "" and not name[:1].isalnum()
+                                 for name in annotation.args):
+            annotation.args = (_option_name(key), *annotation.args)
+        annotation.args = (key, *annotation.args)
+
+        is_optional, hint = _strip_optional(type_hints[key])
+        needs_type = "type" not in annotation.kwargs
+        needs_required = (
+            is_option and not is_optional and "required" not in annotation.kwargs
+            and "default" not in annotation.kwargs)
+        if not needs_type and not needs_required:
+            continue
+
+        # Stub uses click's parser rather than trying to second guess how click will behave
+        stub: _Stub
+        if is_option:
+            stub = click.core.Option(annotation.args, **annotation.kwargs)
+        else:
+            stub = click.core.Argument(annotation.args, **annotation.kwargs)
+        is_flag = isinstance(stub, click.core.Option) and stub.is_flag
+
+        if needs_type and not is_flag:
             annotation.kwargs["type"] = _eval_type(key, hint, stub, complete_type_inferences)
+        # If click would imply is_flag or multiple
+        if needs_required and not is_flag and not stub.multiple:
+            annotation.kwargs["required"] = True
 
 
 def _eval_type(
-        key: str, hint: typing.Type[Any], stub: click.core.Option | click.core.Argument,
-        inferences: InferenceType) -> click.ParamType | tuple[click.ParamType, ...]:
-    try:
-        hint_origin = typing.get_origin(hint)
-        hint_args = typing.get_args(hint)
-        if stub.multiple or stub.nargs == -1:
-            if hint_origin is tuple and len(hint_args) == 2 and hint_args[1] is ...:
-                hint = hint_args[0]
-                hint_origin = typing.get_origin(hint)
-                hint_args = typing.get_args(hint)
-            else:
-                raise TypeError(f"Could not infer ParamType for {key} type {hint!r}. Explicitly annotate type=<type>")
-        if stub.nargs > 1:
-            if hint_origin is tuple:
-                return tuple(inferences[hint_arg] for hint_arg in hint_args)
+        key: str, hint: Any, stub: click.core.Option | click.core.Argument,
+        inferences: typing.Mapping[typing.Type[Any], click.ParamType]) -> click.ParamType | tuple[click.ParamType, ...]:
+    hint_origin, hint_args = _origin_args(hint)
+    if stub.multiple or stub.nargs == -1:
+        if hint_origin is tuple and len(hint_args) == 2 and hint_args[1] is ...:
+            hint = hint_args[0]
+            hint_origin, hint_args = _origin_args(hint)
         else:
-            return inferences[hint]
-    except (KeyError, IndexError):
-        pass
+            raise TypeError(f"Could not infer ParamType for {key} type {hint!r}. Explicitly annotate type=<type>")
+    if stub.nargs > 1:
+        if hint_origin is tuple:
+            param_types = tuple(inferences.get(hint_arg) for hint_arg in hint_args)
+            if None not in param_types:
+                return typing.cast(tuple[click.ParamType, ...], param_types)
+    else:
+        param_type = inferences.get(hint)
+        if param_type is not None:
+            return param_type
     raise TypeError(f"Could not infer ParamType for {key} type {hint!r}. Explicitly annotate type=<type>")
 
 
-def _patch_required(arg_class: typing.Type[Arg], annotations: dict[str, _DelayedCall]) -> None:
-    """Default click option to required if typehint is not OPTIONAL
-
-    If a type hint on the dataclass was not Optional and neither ``default` nor ``required`` were set, then mark the
-    option as ``required=True``.
-    :param arg_class: The dataclass being analyzed
-    :param annotations: Annotations that have already been analyzed
-    :return: None, annotations are updated in place"""
-    type_hints = typing.get_type_hints(arg_class)
-    for key, annotation in annotations.items():
-        hint: typing.Type[Any]
-        is_optional, hint = _strip_optional(type_hints[key])
-        if not is_optional:
-            if annotation.callable is click.option:
-                # If required or default set directly.
-                if "required" not in annotation.kwargs and "default" not in annotation.kwargs:
-                    # Stub uses click's parser rather than trying to second guess how click will behave
-                    # If click would imply is_flag or multiple
-                    stub = click.core.Option(annotation.args, **annotation.kwargs)
-                    if not stub.is_flag and not stub.multiple:
-                        annotation.kwargs["required"] = True
-
-
-def _strip_optional(attribute_type: typing.Type[_T]) -> tuple[bool, typing.Type[_T]]:
+# Typed because Optional[int] and int | None are equal and hash the same, but only the latter is stripped
+@functools.lru_cache(maxsize=None, typed=True)
+def _strip_optional(attribute_type: Any) -> tuple[bool, Any]:
     """Strip NoneType out of union type
 
     We need to know the type for inference purposes, but NoneType is handled separately, inferring something is optional
@@ -249,17 +311,32 @@ def _strip_optional(attribute_type: typing.Type[_T]) -> tuple[bool, typing.Type[
     union entirely.:
     :param attribute_type: The type hint of the attribute
     :return: The type hint minus any union with NoneType.  This may or may not be a union."""
-    if typing.get_origin(attribute_type) is types.UnionType:
-        args = typing.get_args(attribute_type)
-        if types.NoneType in typing.get_args(attribute_type):
+    origin, args = _origin_args(attribute_type)
+    if origin is types.UnionType:
+        if types.NoneType in args:
             args = tuple(arg for arg in args if arg != types.NoneType)
             if len(args) == 1:
                 return True, args[0]
-            return True, functools.reduce(operator.or_, args)
+            return True, typing.Union[args]
     return False, attribute_type
 
 
-def _collect_click_annotations(arg_class: typing.Type[Arg]) -> dict[str, _DelayedCall]:
+def _collect_click_annotations(arg_class: type) -> dict[str, _DelayedCall]:
+    """Find all dataclass_click annotations on a class object
+
+    Each call returns fresh _DelayedCall objects so that they may be mutated without affecting the cached template.
+    See ``_collect_template()``.
+
+    :param arg_class: Dataclass to analyze
+    :return: A dictionary _DelayedCall keyed by attribute names"""
+    return {
+        key: _DelayedCall(callable_, args, dict(kwargs_items))
+        for key, callable_, args, kwargs_items in _collect_template(arg_class)
+    }
+
+
+@functools.lru_cache(maxsize=None)
+def _collect_template(arg_class: type) -> tuple[_AnnotationTemplate, ...]:
     """Find all dataclass_click annotations on a class object
 
     Technically there's no reason this must be a dataclass, but that's the general assumption.
@@ -268,21 +345,56 @@ def _collect_click_annotations(arg_class: typing.Type[Arg]) -> dict[str, _Delaye
     Annotation arguments are flattened out to only include _DelayedCall objects.  If more than one _DelayedCall object
     exists, only the first will be taken.
 
+    The result is cached, so it is returned as immutable ``(key, callable, args, kwargs_items)`` tuples rather than
+    _DelayedCall objects.
+
     :param arg_class: Dataclass to analyze
-    :return: A dictionary _DelayedCall keyed by attribute names"""
-    annotations: dict[str, _DelayedCall] = {}
-    for key, value in typing.get_type_hints(arg_class, include_extras=True).items():
+    :return: A tuple of (attribute name, callable, args, kwargs items) in attribute order"""
+    if not _may_have_annotated(arg_class):
+        return ()
+    template = []
+    for key, value in _cached_type_hints(arg_class, True).items():
         if typing.get_origin(value) is typing.Annotated:
             for annotation in typing.get_args(value):
                 if isinstance(annotation, _DelayedCall):
-                    annotations[key] = annotation
+                    template.append((key, annotation.callable, annotation.args, tuple(annotation.kwargs.items())))
                     break
-    return {
-        key: dataclasses.replace(annotation, kwargs=annotation.kwargs.copy())
-        for key, annotation in annotations.items()
-    }
+    return tuple(template)
+
+
+def _may_have_annotated(arg_class: type) -> bool:
+    """Cheaply check if any raw annotation on the class or its bases could be ``Annotated``
+
+    This avoids resolving every type hint with ``typing.get_type_hints()`` for classes with no click annotations at
+    all.  String and forward reference annotations can't be checked without resolving them, so are assumed to be.
+    :param arg_class: Dataclass to analyze
+    :return: False if no attribute can be ``Annotated``"""
+    for base in arg_class.__mro__:
+        for value in inspect.get_annotations(base).values():
+            if isinstance(value, (str, typing.ForwardRef)) or typing.get_origin(value) is typing.Annotated:
+                return True
+    return False
+
 
+@functools.lru_cache(maxsize=None)
+def _cached_type_hints(cls: type, include_extras: bool = False) -> dict[str, Any]:
+    """Cached ``typing.get_type_hints()``
 
+    Class annotations are not expected to change after the class is created, so forward references only need resolving
+    once per class.  The returned dict is shared and must not be mutated."""
+    return typing.get_type_hints(cls, include_extras=include_extras)
+
+
+@functools.lru_cache(maxsize=1024, typed=True)
+def _origin_args(hint: Any) -> tuple[Any, tuple[Any, ...]]:
+    """Cached ``typing.get_origin()`` and ``typing.get_args()`` of a type hint
+
+    Caching the pair means the cost of hashing the hint is shared between both calls.  The cache is typed because hints
+    such as ``Optional[int]`` and ``int | None`` are equal and hash the same but have different origins."""
+    return typing.get_origin(hint), typing.get_args(hint)
+
+
+@functools.lru_cache(maxsize=1024)
 def _option_name(attribute_name: str) -> str:
     """Infer option name from attribute name"""
     return "--" + attribute_name.lower().replace("_", "-")
@@ -308,17 +420,39 @@ def register_type_inference(
     :param override_okay: If False (default) raise a ``ValueError`` if the python_type is already registered.
         If attempting to de-register an inference with ``click_param_type=None`` this must be set to True.
     """
+    global _TYPE_INFERENCE
     if not override_okay and python_type in _TYPE_INFERENCE:
         raise ValueError(
             f"Refusing to modify inference for {python_type!r} without override_okay=True. "
             f"Existing inference: {click_param_type!r}")
-    is_optional, _ = _strip_optional(python_type)
+    is_optional, _ = _strip_optional(python_type)  # type: ignore[arg-type]
     if is_optional:
         raise NotImplementedError(f"Optional python types are not supported.  Got {python_type!r}")
-    if click_param_type is None:
-        _TYPE_INFERENCE.pop(python_type, None)
-    else:
-        _TYPE_INFERENCE[python_type] = click_param_type
+    type_inference = dict(_TYPE_INFERENCE)
+    replaced = type_inference.pop(python_type, None)
+    if click_param_type is not None:
+        type_inference[python_type] = _intern_param_type(click_param_type)
+    if replaced is not None and all(param_type is not replaced for param_type in type_inference.values()):
+        # No registered type uses it any more, so don't keep it alive just to share it with future registrations
+        for key in [key for key, param_type in _PARAM_TYPE_INTERN.items() if param_type is replaced]:
+            del _PARAM_TYPE_INTERN[key]
+    _TYPE_INFERENCE = types.MappingProxyType(type_inference)
+    # Cached decorators were built with the old inferences and can never be hit again
+    _DECORATOR_CACHE.clear()
+
+
+def _intern_param_type(click_param_type: click.ParamType) -> click.ParamType:
+    """Return a previously registered ParamType equivalent to the one given, if there is one
+
+    Two ParamType objects are considered equivalent if they are of the same type and have equal attributes.  ParamType
+    objects with unhashable attributes are never interned.
+    :param click_param_type: The ParamType about to be registered
+    :return: Either an existing equivalent ParamType or click_param_type itself"""
+    try:
+        key = (type(click_param_type), tuple(sorted(vars(click_param_type).items())))
+        return _PARAM_TYPE_INTERN.setdefault(key, click_param_type)
+    except TypeError:
+        return click_param_type
 
 
 option = _DelayedFunction(click.option)
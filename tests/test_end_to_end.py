@@ -1,47 +1,123 @@
+import collections
 from dataclasses import dataclass
 from decimal import Decimal
-from typing import Annotated, Any
+from typing import Annotated, Any, Optional
 
 import click
 import pytest
-from click.testing import CliRunner
 
 from dataclass_click import _dataclass_click, dataclass_click, option, argument, register_type_inference
 
 CallRecord = tuple[tuple[Any, ...], dict[str, Any]]
 
+_OPTION = option()
+_OPTION_FOO = option("--foo")
+_OPTION_INT = option(type=click.INT)
+_OPTION_FOO_INT = option("--foo", type=click.INT)
+_OPTION_FOO_STR = option("--foo", type=click.STRING)
+
 
 def quick_run(command, *args: str, expect_exit_code: int = 0) -> None:
-    result = CliRunner().invoke(command, args, catch_exceptions=False)
-    assert result.exit_code == expect_exit_code
+    # Calling main directly skips CliRunner's stream capture, which none of these tests need
+    # Without standalone_mode, main returns the callback's return value, or n if ctx.exit(n) was called.  Test callbacks
+    # all return None, so an int can only have come from ctx.exit(n).
+    try:
+        rv = command.main(list(args), prog_name="test", standalone_mode=False)
+    except click.ClickException as e:
+        rv = e.exit_code
+    assert rv is None or isinstance(rv, int), f"Test callbacks must return None, got {rv!r}"
+    exit_code = 0 if rv is None else rv
+    assert exit_code == expect_exit_code
 
 
-def test_extra_args_are_passed_through():
+def to_cli_string(value: Any) -> str:
+    """Format a value the way a user would type it on the command line"""
+    if hasattr(value, "isoformat"):
+        return value.isoformat()
+    return str(value)
 
-    @dataclass
-    class Config:
-        foo: Annotated[str, option(
-            "--foo",
-            type=click.STRING,
-        )]
+
+@dataclass
+class ExtraArgsConfig:
+    foo: Annotated[str, _OPTION_FOO_STR]
+
+
+@dataclass
+class InferredNameConfig:
+    foo: Annotated[int, _OPTION_INT]
+
+
+@dataclass
+class MappedNameConfig:
+    baz: Annotated[int, _OPTION_FOO_INT]
+
+
+@dataclass
+class ShortNameConfig:
+    baz: Annotated[int, option("-f", type=click.INT)]
+    plus: Annotated[bool, option("+p/-p")]
+
+
+@dataclass
+class OptionalUnionConfig:
+    foo: Annotated[int | str | None, _OPTION]
+
+
+@dataclass
+class RequiredConfig:
+    imply_required: Annotated[int, _OPTION]
+
+
+@dataclass
+class OptionalConfig:
+    bar: Annotated[int | None, _OPTION]
+
+
+@dataclass
+class DataclassDefaultConfig:
+    foo: Annotated[int | None, _OPTION] = 5
+    bar: Annotated[int | None, option(expose_value=False)] = 6
+
+
+@dataclass
+class PlainConfig:
+    foo: int = 5
+
+
+@dataclass
+class StringAnnotationConfig:
+    foo: "Annotated[int, option()]"
+
+
+@dataclass()
+class ParentConfig:
+    foo: Annotated[int | None, _OPTION]
+
+
+@dataclass
+class ChildConfig(ParentConfig):
+    bar: Annotated[int | None, _OPTION]
+
+
+def test_extra_args_are_passed_through():
 
     @click.command()
     @click.option("--bar")
-    @dataclass_click(Config)
+    @dataclass_click(ExtraArgsConfig)
     @click.option("--baz")
     def main(*args, **kwargs):
         results.append((args, kwargs))
 
     results: list[CallRecord] = []
     quick_run(main, "--foo", "a", "--bar", "b", "--baz", "c")
-    assert results == [((Config(foo="a"), ), {"bar": "b", "baz": "c"})]
+    assert results == [((ExtraArgsConfig(foo="a"), ), {"bar": "b", "baz": "c"})]
 
 
 def test_types_can_be_inferred(inferrable_type, example_value_for_inferrable_type):
 
     @dataclass
     class Config:
-        foo: Annotated[inferrable_type, option("--foo")]  # type: ignore
+        foo: Annotated[inferrable_type, _OPTION_FOO]  # type: ignore
 
     @click.command()
     @dataclass_click(Config)
@@ -49,10 +125,7 @@ def test_types_can_be_inferred(inferrable_type, example_value_for_inferrable_typ
         results.append((args, kwargs))
 
     results: list[CallRecord] = []
-    if hasattr(example_value_for_inferrable_type, "isoformat"):
-        str_value = example_value_for_inferrable_type.isoformat()
-    else:
-        str_value = str(example_value_for_inferrable_type)
+    str_value = to_cli_string(example_value_for_inferrable_type)
     quick_run(main, "--foo", str_value)
     assert results == [((Config(foo=example_value_for_inferrable_type), ), {})]
     # Belt and braces, check we got the right type
@@ -72,10 +145,7 @@ def test_multiple_types_can_be_inferred(inferrable_type, example_value_for_infer
         results.append((args, kwargs))
 
     results: list[CallRecord] = []
-    if hasattr(example_value_for_inferrable_type, "isoformat"):
-        str_value = example_value_for_inferrable_type.isoformat()
-    else:
-        str_value = str(example_value_for_inferrable_type)
+    str_value = to_cli_string(example_value_for_inferrable_type)
     if input_type.callable is click.option:
         quick_run(main, "--foo", str_value, "--foo", str_value)
     else:
@@ -96,10 +166,7 @@ def test_nargs_types_can_be_inferred(inferrable_type, example_value_for_inferrab
         results.append((args, kwargs))
 
     results: list[CallRecord] = []
-    if hasattr(example_value_for_inferrable_type, "isoformat"):
-        str_value = example_value_for_inferrable_type.isoformat()
-    else:
-        str_value = str(example_value_for_inferrable_type)
+    str_value = to_cli_string(example_value_for_inferrable_type)
     if input_type.callable is click.option:
         quick_run(main, "--foo", str_value, str_value)
     else:
@@ -151,35 +218,43 @@ def test_types_not_inferred(args: dict[str, Any]):
 def test_inferred_option_name():
     """Test that the option name can be inferred from the attribute name"""
 
-    @dataclass
-    class Config:
-        foo: Annotated[int, option(type=click.INT)]
-
     @click.command()
-    @dataclass_click(Config)
+    @dataclass_click(InferredNameConfig)
     def main(*args, **kwargs):
         results.append((args, kwargs))
 
     results: list[CallRecord] = []
     quick_run(main, "--foo", "10")
-    assert results == [((Config(foo=10), ), {})]
+    assert results == [((InferredNameConfig(foo=10), ), {})]
 
 
 def test_mapped_option_name():
     """Test that the option name does not need to match the attribute name"""
 
-    @dataclass
-    class Config:
-        baz: Annotated[int, option("--foo", type=click.INT)]
-
     @click.command()
-    @dataclass_click(Config)
+    @dataclass_click(MappedNameConfig)
     def main(*args, **kwargs):
         results.append((args, kwargs))
 
     results: list[CallRecord] = []
     quick_run(main, "--foo", "10")
-    assert results == [((Config(baz=10), ), {})]
+    assert results == [((MappedNameConfig(baz=10), ), {})]
+
+
+def test_short_option_name():
+    """Test that a short option name alone stops the long name being inferred"""
+
+    @click.command()
+    @dataclass_click(ShortNameConfig)
+    def main(*args, **kwargs):
+        results.append((args, kwargs))
+
+    results: list[CallRecord] = []
+    quick_run(main, "-f", "10")
+    quick_run(main, "-f", "10", "+p")
+    assert results == [((ShortNameConfig(baz=10, plus=False), ), {}), ((ShortNameConfig(baz=10, plus=True), ), {})]
+    quick_run(main, "--baz", "10", expect_exit_code=2)
+    quick_run(main, "-f", "10", "--plus", expect_exit_code=2)
 
 
 @pytest.mark.parametrize(
@@ -237,11 +312,12 @@ class DecimalParamType(click.ParamType):
 
 
 def test_patch_type_inference(monkeypatch):
-    monkeypatch.setattr(_dataclass_click, "_TYPE_INFERENCE", _dataclass_click._TYPE_INFERENCE.copy())
+    # register_type_inference() replaces _TYPE_INFERENCE, so monkeypatch will restore the original after the test
+    monkeypatch.setattr(_dataclass_click, "_TYPE_INFERENCE", _dataclass_click._TYPE_INFERENCE)
 
     @dataclass
     class Config:
-        imply_required: Annotated[Decimal, option()]
+        imply_required: Annotated[Decimal, _OPTION]
 
     with pytest.raises(TypeError):
 
@@ -258,57 +334,207 @@ def test_patch_type_inference(monkeypatch):
         pass
 
 
-def test_dataclass_can_be_used_twice():
+def test_equivalent_type_inferences_are_shared(monkeypatch):
+    monkeypatch.setattr(_dataclass_click, "_TYPE_INFERENCE", _dataclass_click._TYPE_INFERENCE)
+    monkeypatch.setattr(_dataclass_click, "_PARAM_TYPE_INTERN", {})
+
+    class Foo:
+        pass
+
+    class Bar:
+        pass
+
+    register_type_inference(Foo, click.Path(exists=True))
+    register_type_inference(Bar, click.Path(exists=True))
+    assert _dataclass_click._TYPE_INFERENCE[Foo] is _dataclass_click._TYPE_INFERENCE[Bar]
+    assert len(_dataclass_click._PARAM_TYPE_INTERN) == 1
+
+    # Shared ParamTypes are only dropped once nothing registered uses them
+    register_type_inference(Foo, None, override_okay=True)
+    assert len(_dataclass_click._PARAM_TYPE_INTERN) == 1
+    register_type_inference(Bar, click.Path(exists=False), override_okay=True)
+    assert list(_dataclass_click._PARAM_TYPE_INTERN.values()) == [_dataclass_click._TYPE_INFERENCE[Bar]]
+
+
+def test_type_inferences_argument():
 
     @dataclass
     class Config:
-        imply_required: Annotated[int, option()]
+        foo: Annotated[Decimal, _OPTION]
+        bar: Annotated[int, _OPTION]
 
     @click.command()
-    @dataclass_click(Config)
+    @dataclass_click(Config, type_inferences={Decimal: DecimalParamType()})
+    def main(*args, **kwargs):
+        results.append((args, kwargs))
+
+    results: list[CallRecord] = []
+    quick_run(main, "--foo", "1.5", "--bar", "2")
+    assert results == [((Config(foo=Decimal("1.5"), bar=2), ), {})]
+    assert Decimal not in _dataclass_click._TYPE_INFERENCE
+
+
+def test_optional_union_inference():
+
+    @click.command()
+    @dataclass_click(OptionalUnionConfig, type_inferences={int | str: click.STRING})  # type: ignore[dict-item]
+    def main(*args, **kwargs):
+        results.append((args, kwargs))
+
+    results: list[CallRecord] = []
+    quick_run(main, "--foo", "a")
+    quick_run(main)
+    assert results == [((OptionalUnionConfig(foo="a"), ), {}), ((OptionalUnionConfig(foo=None), ), {})]
+
+
+def test_equal_optional_hints_are_not_confused():
+    """typing.Optional[X] and X | None are equal and hash the same, but only X | None implies not required"""
+
+    @dataclass
+    class OptionalFirst:
+        x: Annotated[Optional[float], option(type=click.FLOAT, required=False)]
+
+    @dataclass
+    class UnionSecond:
+        y: Annotated[float | None, option()]
+
+    @click.command()
+    @dataclass_click(OptionalFirst)
     def main_1(*args, **kwargs):
         pass
 
     @click.command()
-    @dataclass_click(Config)
+    @dataclass_click(UnionSecond)
     def main_2(*args, **kwargs):
-        pass
+        results.append((args, kwargs))
 
+    results: list[CallRecord] = []
+    quick_run(main_2)
+    assert results == [((UnionSecond(y=None), ), {})]
 
-def test_keyword_name():
+
+def test_dataclass_can_be_used_twice():
+
+    @click.command()
+    @dataclass_click(RequiredConfig)
+    def main_1(*args, **kwargs):
+        results.append((args, kwargs))
+
+    @click.command()
+    @dataclass_click(RequiredConfig)
+    def main_2(*args, **kwargs):
+        results.append((args, kwargs))
+
+    results: list[CallRecord] = []
+    quick_run(main_1, "--imply-required", "1")
+    quick_run(main_2, "--imply-required", "2")
+    assert results == [((RequiredConfig(imply_required=1), ), {}), ((RequiredConfig(imply_required=2), ), {})]
+
+
+def test_dataclass_can_be_analyzed_twice():
+
+    @click.command()
+    @dataclass_click(RequiredConfig)
+    def main_1(*args, **kwargs):
+        results.append((args, kwargs))
+
+    # A different kw_name avoids the decorator cache so the class is analyzed a second time
+    @click.command()
+    @dataclass_click(RequiredConfig, kw_name="config")
+    def main_2(*args, **kwargs):
+        results.append((args, kwargs))
+
+    results: list[CallRecord] = []
+    quick_run(main_1, "--imply-required", "1")
+    quick_run(main_2, "--imply-required", "2")
+    assert results == [((RequiredConfig(imply_required=1), ), {}), ((), {"config": RequiredConfig(imply_required=2)})]
+
+
+def test_decorator_is_cached():
 
     @dataclass
     class Config:
-        bar: Annotated[int | None, option()]
+        foo: Annotated[int, _OPTION]
+
+    assert dataclass_click(Config) is dataclass_click(Config)
+    assert dataclass_click(Config) is not dataclass_click(Config, kw_name="config")
+    assert dataclass_click(Config) is not dataclass_click(Config, type_inferences={int: click.INT})
+
+
+def test_decorator_cache_is_bounded(monkeypatch):
+    monkeypatch.setattr(_dataclass_click, "_DECORATOR_CACHE_SIZE", 1)
+    monkeypatch.setattr(_dataclass_click, "_DECORATOR_CACHE", collections.OrderedDict())
+
+    @dataclass
+    class Config:
+        foo: Annotated[int, _OPTION]
+
+    first = dataclass_click(Config)
+    assert dataclass_click(Config) is first
+    dataclass_click(Config, kw_name="config")
+    assert len(_dataclass_click._DECORATOR_CACHE) == 1
+    assert dataclass_click(Config) is not first
+
+
+def test_keyword_name():
 
     @click.command()
-    @dataclass_click(Config, kw_name="foo")
+    @dataclass_click(OptionalConfig, kw_name="foo")
     def main(*args, **kwargs):
         results.append((args, kwargs))
 
     results: list[CallRecord] = []
     quick_run(main)
-    assert results == [((), {"foo": Config(bar=None)})]
+    assert results == [((), {"foo": OptionalConfig(bar=None)})]
 
 
-def test_inheritance():
+def test_missing_value_uses_dataclass_default():
+    """Values click does not pass to the wrapper are not passed to the dataclass either"""
 
-    @dataclass()
-    class Parent:
-        foo: Annotated[int | None, option()]
+    @click.command()
+    @dataclass_click(DataclassDefaultConfig)
+    def main(*args, **kwargs):
+        results.append((args, kwargs))
 
-    @dataclass
-    class Config(Parent):
-        bar: Annotated[int | None, option()]
+    results: list[CallRecord] = []
+    quick_run(main, "--foo", "10")
+    assert results == [((DataclassDefaultConfig(foo=10, bar=6), ), {})]
+
+
+def test_no_click_annotations():
 
     @click.command()
-    @dataclass_click(Config)
+    @dataclass_click(PlainConfig)
+    def main(*args, **kwargs):
+        results.append((args, kwargs))
+
+    results: list[CallRecord] = []
+    quick_run(main)
+    assert results == [((PlainConfig(foo=5), ), {})]
+
+
+def test_string_annotation():
+
+    @click.command()
+    @dataclass_click(StringAnnotationConfig)
+    def main(*args, **kwargs):
+        results.append((args, kwargs))
+
+    results: list[CallRecord] = []
+    quick_run(main, "--foo", "10")
+    assert results == [((StringAnnotationConfig(foo=10), ), {})]
+
+
+def test_inheritance():
+
+    @click.command()
+    @dataclass_click(ChildConfig)
     def main(*args, **kwargs):
         results.append((args, kwargs))
 
     results: list[CallRecord] = []
     quick_run(main, "--foo", "10", "--bar", "20")
-    assert results == [((Config(foo=10, bar=20), ), {})]
+    assert results == [((ChildConfig(foo=10, bar=20), ), {})]
 
 
 def test_mypy_check_loads():